@@ -13,17 +13,27 @@ def install_dependencies():
     """Install required Python packages."""
     requirements = [
         "requests",
-        "gradio",
-        "sqlite3"
+        "gradio"
     ]
     
-    for requirement in requirements:
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", requirement])
-            print(f"Successfully installed {requirement}")
-        except subprocess.CalledProcessError as e:
-            print(f"Failed to install {requirement}: {e}")
-            return False
+    # One pip invocation resolves everything in a single pass
+    try:
+        subprocess.check_call([
+            sys.executable, "-m", "pip", "install",
+            "--disable-pip-version-check", "--no-input",
+            *requirements
+        ])
+        print(f"Successfully installed {', '.join(requirements)}")
+    except subprocess.CalledProcessError as e:
+        print(f"Failed to install {', '.join(requirements)}: {e}")
+        return False
+    
+    # sqlite3 ships with Python; just verify it is usable
+    try:
+        import sqlite3
+    except ImportError as e:
+        print(f"sqlite3 module is not available: {e}")
+        return False
     return True
 
 def setup_database():
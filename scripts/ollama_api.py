@@ -8,12 +8,31 @@ Handles communication with the Ollama API for model interactions.
 import requests
 import json
 import time
-from typing import Dict, List, Optional, Union, Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, Union, Generator
 from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+class _ModelsCache(NamedTuple):
+    """Snapshot of a /api/tags listing with precomputed lookup keys."""
+    fetched_at: float
+    models: List[Dict]
+    names: Set[str]  # full and base model names
+    search_keys: List[Tuple[str, str]]  # (lowercased name, base name)
 
 class OllamaAPI:
     """API client for interacting with Ollama."""
     
+    # Seconds a /api/tags listing is reused before hitting the server again
+    MODELS_CACHE_TTL = 5.0
+    
     def __init__(self, base_url: str = "http://localhost:11434", timeout: int = 30):
         """Initialize the Ollama API client."""
         self.base_url = base_url.rstrip('/')
@@ -21,26 +40,54 @@ class OllamaAPI:
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
-            'User-Agent': 'A1111-Ollama-Extension/1.0.0'
+            'User-Agent': 'A1111-Ollama-Extension/1.0.0',
+            'Connection': 'keep-alive'
         })
+        
+        # Reuse pooled keep-alive connections across chat/generate calls
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            pool_block=False,
+            # Only retry transient gateway errors; a server that is down
+            # (connection refused) should fail fast, e.g. for ping()
+            max_retries=Retry(
+                total=2,
+                connect=0,
+                backoff_factor=0.1,
+                status_forcelist=[502, 503, 504],
+                raise_on_status=False
+            )
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self._verbs = {
+            'GET': self.session.get,
+            'POST': self.session.post,
+            'DELETE': self.session.delete,
+            'PUT': self.session.put
+        }
+        
+        self._models_cache = _ModelsCache(0.0, [], set(), [])
     
     def _make_request(self, endpoint: str, method: str = 'GET', 
                      data: Optional[Dict] = None, stream: bool = False) -> Union[Dict, Generator]:
         """Make a request to the Ollama API."""
         url = urljoin(self.base_url + '/', endpoint.lstrip('/'))
         
+        verb = method.upper()
+        send = self._verbs.get(verb)
+        if send is None:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
         try:
-            if method.upper() == 'GET':
-                response = self.session.get(url, timeout=self.timeout, stream=stream)
-            elif method.upper() == 'POST':
-                response = self.session.post(
-                    url, 
-                    json=data, 
-                    timeout=self.timeout if not stream else None,
-                    stream=stream
-                )
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+            response = send(
+                url,
+                json=data if verb != 'GET' else None,
+                timeout=self.timeout if not stream else None,
+                stream=stream
+            )
             
             response.raise_for_status()
             
@@ -60,12 +107,28 @@ class OllamaAPI:
     
     def _stream_response(self, response) -> Generator[Dict, None, None]:
         """Process streaming response from Ollama."""
-        for line in response.iter_lines():
-            if line:
-                try:
-                    yield json.loads(line.decode('utf-8'))
-                except json.JSONDecodeError:
-                    continue
+        buffer = bytearray()
+        # chunk_size=None hands back each chunk as soon as it arrives
+        for chunk in response.iter_content(chunk_size=None):
+            buffer += chunk
+            start = 0
+            newline = buffer.find(b'\n')
+            while newline != -1:
+                if newline > start:
+                    try:
+                        yield _loads(buffer[start:newline])
+                    except json.JSONDecodeError:
+                        pass
+                start = newline + 1
+                newline = buffer.find(b'\n', start)
+            del buffer[:start]
+        
+        # Final object may not be newline-terminated
+        if buffer.strip():
+            try:
+                yield _loads(buffer)
+            except json.JSONDecodeError:
+                pass
     
     def ping(self) -> bool:
         """Check if Ollama server is running."""
@@ -77,17 +140,51 @@ class OllamaAPI:
     
     def get_models(self) -> List[Dict]:
         """Get list of available models."""
+        return list(self._get_models_cache().models)
+    
+    def _get_models_cache(self) -> _ModelsCache:
+        """Return the cached model listing, refetching it once it has expired."""
+        cache = self._models_cache
+        if cache.fetched_at and time.monotonic() - cache.fetched_at < self.MODELS_CACHE_TTL:
+            return cache
+        
         try:
             response = self._make_request('/api/tags')
-            return response.get('models', [])
+            models = response.get('models', [])
         except Exception as e:
             print(f"Error getting models: {e}")
-            return []
+            self._invalidate_models_cache()
+            return _ModelsCache(0.0, [], set(), [])
+        
+        names = set()
+        search_keys = []
+        for model in models:
+            model_name = model.get('name', '')
+            base_name = model_name.split(':', 1)[0]
+            names.add(model_name)
+            names.add(base_name)
+            search_keys.append((model_name.lower(), base_name))
+        cache = _ModelsCache(time.monotonic(), models, names, search_keys)
+        self._models_cache = cache
+        return cache
+    
+    def _invalidate_models_cache(self):
+        """Force the next model lookup to refetch from the server."""
+        self._models_cache = _ModelsCache(0.0, [], set(), [])
+    
+    def _invalidate_models_after(self, stream: Generator[Dict, None, None]) -> Generator[Dict, None, None]:
+        """Pass a streaming response through, then invalidate the model cache."""
+        try:
+            yield from stream
+        finally:
+            self._invalidate_models_cache()
     
     def pull_model(self, model_name: str) -> Generator[Dict, None, None]:
         """Pull a model from the Ollama registry."""
         data = {'name': model_name}
-        return self._make_request('/api/pull', 'POST', data, stream=True)
+        return self._invalidate_models_after(
+            self._make_request('/api/pull', 'POST', data, stream=True)
+        )
     
     def chat(self, message: str, model: str = "llama2", 
             system_prompt: Optional[str] = None, 
@@ -184,7 +281,9 @@ class OllamaAPI:
         if base_model:
             data['stream'] = True
         
-        return self._make_request('/api/create', 'POST', data, stream=True)
+        return self._invalidate_models_after(
+            self._make_request('/api/create', 'POST', data, stream=True)
+        )
     
     def delete_model(self, model_name: str) -> bool:
         """Delete a model."""
@@ -195,6 +294,8 @@ class OllamaAPI:
         except Exception as e:
             print(f"Error deleting model {model_name}: {e}")
             return False
+        finally:
+            self._invalidate_models_cache()
     
     def copy_model(self, source: str, destination: str) -> bool:
         """Copy a model."""
@@ -208,6 +309,8 @@ class OllamaAPI:
         except Exception as e:
             print(f"Error copying model from {source} to {destination}: {e}")
             return False
+        finally:
+            self._invalidate_models_cache()
     
     def show_model_info(self, model_name: str) -> Dict:
         """Get detailed information about a model."""
@@ -229,24 +332,21 @@ class OllamaAPI:
     
     def check_model_exists(self, model_name: str) -> bool:
         """Check if a model exists locally."""
-        models = self.get_models()
-        for model in models:
-            if model.get('name', '').startswith(model_name):
-                return True
-        return False
+        cache = self._get_models_cache()
+        if model_name in cache.names:
+            return True
+        # Fall back to prefix matching, e.g. partial tags like "llama2:7"
+        return any(model.get('name', '').startswith(model_name) for model in cache.models)
     
     def get_model_suggestions(self, partial_name: str = "") -> List[str]:
         """Get model name suggestions based on partial input."""
-        models = self.get_models()
-        suggestions = []
+        cache = self._get_models_cache()
+        partial = partial_name.lower()
         
-        for model in models:
-            model_name = model.get('name', '')
-            if partial_name.lower() in model_name.lower():
-                # Extract base model name (before the colon)
-                base_name = model_name.split(':')[0]
-                if base_name not in suggestions:
-                    suggestions.append(base_name)
+        suggestions = {
+            base_name for name_lower, base_name in cache.search_keys
+            if partial in name_lower
+        }
         
         return sorted(suggestions)
     
@@ -261,22 +361,37 @@ class OllamaAPI:
         }
         
         try:
-            # Check if server is running
-            health_info['server_running'] = self.ping()
+            # Issue the probes concurrently; the version request doubles as the ping.
+            # The workers share self.session, which requests does not guarantee to be
+            # thread-safe; this is limited to read-only GETs that touch no session state.
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                version_future = pool.submit(self._make_request, '/api/version')
+                models_future = pool.submit(self._make_request, '/api/tags')
+                running_future = pool.submit(self._make_request, '/api/ps')
+            
+            try:
+                version_info = version_future.result()
+                health_info['server_running'] = True
+            except Exception:
+                version_info = None
             
             if health_info['server_running']:
                 # Get version info
-                try:
-                    version_info = self._make_request('/api/version')
-                    health_info['version'] = version_info.get('version', 'unknown')
-                except:
-                    pass
+                health_info['version'] = version_info.get('version', 'unknown')
                 
                 # Get available models
-                health_info['models_available'] = [m.get('name', '') for m in self.get_models()]
+                try:
+                    models = models_future.result().get('models', [])
+                except Exception:
+                    models = []
+                health_info['models_available'] = [m.get('name', '') for m in models]
                 
                 # Get running models
-                health_info['running_models'] = [m.get('name', '') for m in self.get_running_models()]
+                try:
+                    running = running_future.result().get('models', [])
+                except Exception:
+                    running = []
+                health_info['running_models'] = [m.get('name', '') for m in running]
         
         except Exception as e:
             health_info['error'] = str(e)
@@ -288,6 +403,10 @@ class OllamaAPI:
         if self.session:
             self.session.close()
     
-    def __del__(self):
-        """Ensure session is closed on object destruction."""
+    def __enter__(self):
+        """Support use as a context manager."""
+        return self
+    
+    def __exit__(self, *exc_info):
+        """Close the session when leaving the context."""
         self.close()